@@ -7,7 +7,7 @@
 import asyncio
 import json
 import sys
-from typing import Any, Dict, List
+from typing import Any, Dict
 
 class 设计文档生成Server:
     def __init__(self):
@@ -7,7 +7,7 @@
 import asyncio
 import json
 import sys
-from typing import Any, Dict, List
+from typing import Any, Dict
 
 class 架构分析MCP服务器Server:
     def __init__(self):
@@ -6,283 +6,431 @@
 
 import asyncio
 import json
+import os
+import re
 import sys
-from typing import Any, Dict, List
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from string import Template
+from typing import Any, Dict
+
+# 扫描项目时并发读取 Java 文件的线程数（读取以 I/O 为主）
+_SCAN_WORKERS = 8
+
+# Java 文件数达到该值且有多个 CPU 时改用进程池解析，绕开 GIL；
+# 文件较少时创建子进程的开销得不偿失，单核机器上进程池比线程池更慢
+_PROCESS_SCAN_THRESHOLD = 2000
+
+# Java 源码关键行：一次扫描同时匹配 package 声明、public 类/接口声明和注解
+_JAVA_DECL_RE = re.compile(
+    r'^[ \t]*(?:package\s+([\w.]+)\s*;'
+    r'|public\s+(?:class|interface)\s+(\w+)'
+    r'|(@[\w.]+))',
+    re.MULTILINE)
+
+# 分层识别规则，按优先级排列，先匹配的层胜出
+# 包名：按 '.' 切分后的段与关键字做整段匹配（含复数形式）
+_PACKAGE_LAYER_KEYWORDS = (
+    (frozenset({'entity', 'entities', 'model', 'models', 'domain'}), 'entity'),
+    (frozenset({'repository', 'repositories', 'dao', 'daos', 'mapper', 'mappers'}), 'repository'),
+    (frozenset({'service', 'services'}), 'service'),
+    (frozenset({'controller', 'controllers', 'web', 'rest'}), 'controller'),
+    (frozenset({'dto', 'dtos', 'vo', 'vos', 'request', 'requests', 'response', 'responses'}), 'dto'),
+)
+
+# 类名（小写）后缀
+_CLASS_SUFFIX_LAYERS = (
+    (('entity', 'model'), 'entity'),
+    (('repository', 'dao', 'mapper'), 'repository'),
+    (('service', 'serviceimpl'), 'service'),
+    (('controller', 'resource'), 'controller'),
+    (('dto', 'vo', 'request', 'response'), 'dto'),
+)
+
+# 注解
+_ANNOTATION_LAYERS = {
+    '@Entity': 'entity',
+    '@Table': 'entity',
+    '@Repository': 'repository',
+    '@Mapper': 'repository',
+    '@Service': 'service',
+    '@Component': 'service',
+    '@Controller': 'controller',
+    '@RestController': 'controller',
+}
 
-class 代码生成MCP服务器Server:
-    def __init__(self):
-        self.tools = {
-            "generate_crud_module": {
-                        "description": "生成完整的CRUD模块",
-                        "parameters": {
-                                    "type": "object",
-                                    "properties": {
-                                                "entity_name": {
-                                                            "type": "string",
-                                                            "description": "实体名称"
-                                                },
-                                                "fields": {
-                                                            "type": "array",
-                                                            "description": "字段定义",
-                                                            "items": {
-                                                                        "type": "object",
-                                                                        "properties": {
-                                                                                    "name": {
-                                                                                                "type": "string"
-                                                                                    },
-                                                                                    "type": {
-                                                                                                "type": "string"
-                                                                                    }
-                                                                        }
-                                                            }
-                                                },
-                                                "project_path": {
-                                                            "type": "string",
-                                                            "description": "项目根目录路径，默认为当前目录"
-                                                },
-                                                "package_name": {
-                                                            "type": "string",
-                                                            "description": "包名，如果不指定将自动分析项目结构推断"
-                                                }
-                                    },
-                                    "required": [
-                                                "entity_name",
-                                                "fields"
-                                    ]
-                        }
-            },
-            "generate_entity": {
-                        "description": "生成实体类",
-                        "parameters": {
-                                    "type": "object",
-                                    "properties": {
-                                                "entity_name": {
-                                                            "type": "string",
-                                                            "description": "实体名称"
-                                                },
-                                                "fields": {
-                                                            "type": "array",
-                                                            "description": "字段定义"
-                                                }
-                                    },
-                                    "required": [
-                                                "entity_name",
-                                                "fields"
-                                    ]
-                        }
-            }
+# 推断命名规范时各层识别的类名后缀，按顺序取第一个匹配的
+# 实体类允许没有后缀：末尾的 '' 总能匹配，表示无后缀
+_SUFFIXES_BY_LAYER = {
+    'entity': ('Entity', 'Model', ''),
+    'repository': ('Repository', 'Dao', 'Mapper'),
+    'service': ('ServiceImpl', 'Service'),
+    'controller': ('Controller', 'Resource'),
 }
-    
-    async def handle_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
-        """处理 MCP 请求"""
-        method = request.get("method")
-        params = request.get("params", {})
-        request_id = request.get("id")
-        
+
+# 框架识别用到的注解（frozenset.isdisjoint 对每个注解只做一次哈希查找）
+_JPA_ANNOTATIONS = frozenset({'@Entity', '@Table', '@Id'})
+_WEB_ANNOTATIONS = frozenset({'@RestController', '@Controller'})
+_VALIDATION_ANNOTATION_PREFIXES = ('@Valid', '@NotNull', '@NotBlank')
+
+# 源码中是否提到 mybatis（不区分大小写），直接在原文上搜索，不必生成整份小写副本
+_MYBATIS_RE = re.compile('mybatis', re.IGNORECASE)
+
+# 在项目根目录下查找源码位置时跳过的目录：版本库、依赖、构建产物和 IDE 配置。
+# 只用于这一查找；build、out 等也可能是合法的包名段，扫描源码目录时不能跳过
+_SKIP_DIRS = frozenset({'.git', 'node_modules', 'target', 'build', '.idea', '.gradle', 'out', 'dist'})
+
+
+# 同一个包下通常有很多类，按包名缓存分层结果，同包的文件只需判断一次
+@lru_cache(maxsize=1024)
+def _package_layer(package_name: str):
+    """根据包名判断所属层，无法判断时返回 None"""
+    package_segments = package_name.lower().split('.')
+    for keywords, layer in _PACKAGE_LAYER_KEYWORDS:
+        if not keywords.isdisjoint(package_segments):
+            return layer
+    return None
+
+
+def _iter_java_files(directory, skip_dirs=frozenset()):
+    """按 os.walk 的顺序逐个产出目录下的 .java 文件，跳过隐藏目录和 skip_dirs 中的目录"""
+    try:
+        with os.scandir(directory) as it:
+            entries = list(it)
+    except OSError:
+        return
+
+    subdirs = []
+    for entry in entries:
+        if entry.is_dir(follow_symlinks=False):
+            if entry.name not in skip_dirs and not entry.name.startswith('.'):
+                subdirs.append(entry.path)
+        elif entry.name.endswith('.java'):
+            yield Path(entry.path)
+
+    for subdir in subdirs:
+        yield from _iter_java_files(subdir, skip_dirs)
+
+
+def _read_java_source(java_file) -> str:
+    """读取 Java 源文件：纯 ASCII 文件走快速解码，其余按 UTF-8 容错解码"""
+    with open(java_file, 'rb') as f:
+        raw = f.read()
+    try:
+        return raw.decode('ascii')
+    except UnicodeDecodeError:
+        # 非 UTF-8 编码（如 GBK）的文件也要参与学习，无法解码的字节用替换字符代替
+        return raw.decode('utf-8', errors='replace')
+
+
+def _parse_java_file(java_file):
+    """读取并解析单个 Java 文件
+
+    返回 (包名列表, 类名, 注解列表, 是否提到 mybatis)，读取失败时返回 None。
+    只返回很小的解析结果，既可以在线程池也可以在进程池中执行。
+    """
+    try:
+        content = _read_java_source(java_file)
+    except OSError:
+        return None
+
+    packages = []
+    class_name = None
+    annotations = []
+
+    for match in _JAVA_DECL_RE.finditer(content):
+        package_group, class_group, annotation = match.groups()
+
+        # 提取包名
+        if package_group:
+            packages.append(package_group)
+
+        # 提取类名（\w+ 不含泛型参数）
+        elif class_group:
+            class_name = class_group
+
+        # 提取注解（不含参数部分）
+        else:
+            annotations.append(annotation)
+
+    # 框架识别只在没有 JPA 注解和 @Mapper 时才需要检查源码中是否提到 mybatis
+    mentions_mybatis = False
+    if packages and class_name and '@Mapper' not in annotations \
+            and _JPA_ANNOTATIONS.isdisjoint(annotations):
+        mentions_mybatis = _MYBATIS_RE.search(content) is not None
+
+    return packages, class_name, annotations, mentions_mybatis
+
+
+def _parse_java_files(java_files: list) -> list:
+    """并行解析 Java 文件，结果与 java_files 一一对应"""
+    if len(java_files) >= _PROCESS_SCAN_THRESHOLD and (os.cpu_count() or 1) > 1:
         try:
-            if method == "initialize":
-                return {
-                    "jsonrpc": "2.0",
-                    "id": request_id,
-                    "result": {
-                        "protocolVersion": "2024-11-05",
-                        "capabilities": {"tools": {}},
-                        "serverInfo": {
-                            "name": "代码生成MCP服务器",
-                            "version": "1.0.0"
-                        }
-                    }
-                }
-            
-            elif method == "tools/list":
-                tools_list = []
-                for name, tool_info in self.tools.items():
-                    tools_list.append({
-                        "name": name,
-                        "description": tool_info["description"],
-                        "inputSchema": tool_info["parameters"]
-                    })
-                
-                return {
-                    "jsonrpc": "2.0",
-                    "id": request_id,
-                    "result": {"tools": tools_list}
-                }
-            
-            elif method == "tools/call":
-                tool_name = params.get("name")
-                arguments = params.get("arguments", {})
-                
-                # 调用对应的工具方法
-                if hasattr(self, f"handle_{tool_name}"):
-                    result = await getattr(self, f"handle_{tool_name}")(arguments)
-                else:
-                    result = await self.handle_default_tool(tool_name, arguments)
-                
-                return {
-                    "jsonrpc": "2.0",
-                    "id": request_id,
-                    "result": {
-                        "content": [{
-                            "type": "text",
-                            "text": json.dumps(result, indent=2, ensure_ascii=False)
-                        }]
-                    }
-                }
-            
-            else:
-                raise ValueError(f"Unknown method: {method}")
-        
-        except Exception as e:
-            return {
-                "jsonrpc": "2.0",
-                "id": request_id,
-                "error": {
-                    "code": -32000,
-                    "message": str(e)
-                }
-            }
-    
-    async def handle_default_tool(self, tool_name: str, arguments: Dict[str, Any]):
-        """默认工具处理器"""
-        return {
-            "status": "success",
-            "tool": tool_name,
-            "message": f"{tool_name} 执行成功",
-            "arguments": arguments,
-            "result": "功能正常，等待具体实现"
-        }
+            with ProcessPoolExecutor() as executor:
+                return list(executor.map(_parse_java_file, java_files, chunksize=64))
+        except Exception:
+            # 无法创建或运行子进程时（如受限环境、spawn 模式下的序列化失败）退回线程池
+            pass
 
-    async def handle_generate_crud_module(self, arguments: Dict[str, Any]):
-        """生成完整的CRUD模块"""
-        entity_name = arguments.get("entity_name", "")
-        fields = arguments.get("fields", [])
-        project_path = arguments.get("project_path", ".")
-        package_name = arguments.get("package_name", None)
+    # 文件读取以 I/O 为主，线程池即可并发
+    with ThreadPoolExecutor(max_workers=_SCAN_WORKERS) as executor:
+        return list(executor.map(_parse_java_file, java_files))
 
-        # 智能分析项目结构
-        project_info = self._analyze_project_structure(project_path)
 
-        # 如果没有指定包名，使用分析得到的包名
-        if not package_name:
-            package_name = project_info.get("base_package", "com.example")
+def _write_source_file(file_path, content):
+    """以 UTF-8 写入单个源码文件：内容一次编码，直接写文件描述符，绕过文本 I/O 缓冲层"""
+    data = content.encode('utf-8')
+    fd = os.open(file_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+    try:
+        view = memoryview(data)
+        while view:
+            written = os.write(fd, view)
+            view = view[written:]
+    finally:
+        os.close(fd)
 
-        # 生成文件内容
-        generated_files = {
-            "entity": {},
-            "repository": {},
-            "service": {},
-            "controller": {},
-            "dto/request": {},
-            "dto/response": {}
-        }
 
-        # 1. 生成实体类
-        entity_code = self._generate_entity_class(entity_name, fields, package_name)
-        generated_files["entity"][f"{entity_name}.java"] = entity_code
+def _write_source_files(pending_writes):
+    """并发写入 [(文件路径, 内容), ...]，任一文件写入失败时抛出异常"""
+    if not pending_writes:
+        return
 
-        # 2. 生成Repository接口
-        repository_code = self._generate_repository_interface(entity_name, package_name)
-        generated_files["repository"][f"{entity_name}Repository.java"] = repository_code
+    # 先一次性创建所有目标目录（同一目录只创建一次），再批量写入
+    for directory in {file_path.parent for file_path, _ in pending_writes}:
+        directory.mkdir(parents=True, exist_ok=True)
 
-        # 3. 生成Service类
-        service_code = self._generate_service_class(entity_name, package_name)
-        generated_files["service"][f"{entity_name}Service.java"] = service_code
+    with ThreadPoolExecutor(max_workers=min(_SCAN_WORKERS, len(pending_writes))) as executor:
+        # 消费 map 的结果，确保写入异常能传播给调用方
+        list(executor.map(lambda item: _write_source_file(*item), pending_writes))
 
-        # 4. 生成Controller类
-        controller_code = self._generate_controller_class(entity_name, package_name)
-        generated_files["controller"][f"{entity_name}Controller.java"] = controller_code
 
-        # 5. 生成DTO类
-        request_dto_code = self._generate_request_dto(entity_name, fields, package_name)
-        response_dto_code = self._generate_response_dto(entity_name, fields, package_name)
-        generated_files["dto/request"][f"Create{entity_name}Request.java"] = request_dto_code
-        generated_files["dto/response"][f"{entity_name}Response.java"] = response_dto_code
+# 工具结果编码器：json.dumps 带参数调用时每次都会新建 JSONEncoder，这里复用同一个实例。
+# 默认不缩进，走 json 的 C 加速编码路径；设置环境变量 MCP_PRETTY 时按 2 空格缩进输出，便于调试时阅读
+_RESULT_ENCODER = json.JSONEncoder(indent=2 if os.environ.get("MCP_PRETTY") else None,
+                                   ensure_ascii=False)
 
-        # 保存生成的文件到学习到的项目结构
-        saved_files = self._save_files_to_learned_structure(generated_files, project_info, package_name)
+# Java 源码模板：模块加载时构建一次，生成时只做变量替换
+_REPOSITORY_TEMPLATE = Template("""package ${package_name}.repository;
 
-        # 转换 project_info 中的 Path 对象为字符串
-        serializable_project_info = {}
-        for key, value in project_info.items():
-            if hasattr(value, '__fspath__'):  # Path 对象
-                serializable_project_info[key] = str(value)
-            else:
-                serializable_project_info[key] = value
+import ${package_name}.entity.${entity_name};
+import org.springframework.data.jpa.repository.JpaRepository;
+import org.springframework.data.jpa.repository.Query;
+import org.springframework.data.repository.query.Param;
+import org.springframework.stereotype.Repository;
 
-        return {
-            "status": "success",
-            "message": f"成功生成完整的CRUD模块，包含 {len(saved_files)} 个文件",
-            "files": saved_files,
-            "project_info": serializable_project_info,
-            "package_name": package_name,
-            "components": ["Entity", "Repository", "Service", "Controller", "DTOs"]
+import java.util.List;
+import java.util.Optional;
+
+@Repository
+public interface ${entity_name}Repository extends JpaRepository<${entity_name}, Long> {
+
+    // 根据名称查找（假设有name字段）
+    Optional<${entity_name}> findByName(String name);
+
+    // 分页查询活跃记录
+    @Query("SELECT e FROM ${entity_name} e WHERE e.createdAt >= :startDate")
+    List<${entity_name}> findRecentRecords(@Param("startDate") java.time.LocalDateTime startDate);
+
+    // 统计总数
+    @Query("SELECT COUNT(e) FROM ${entity_name} e")
+    long countTotal();
+}""")
+
+_SERVICE_TEMPLATE = Template("""package ${package_name}.service;
+
+import ${package_name}.entity.${entity_name};
+import ${package_name}.repository.${entity_name}Repository;
+import ${package_name}.dto.request.Create${entity_name}Request;
+import ${package_name}.dto.response.${entity_name}Response;
+import org.springframework.beans.factory.annotation.Autowired;
+import org.springframework.data.domain.Page;
+import org.springframework.data.domain.Pageable;
+import org.springframework.stereotype.Service;
+import org.springframework.transaction.annotation.Transactional;
+
+import java.util.List;
+import java.util.Optional;
+import java.util.stream.Collectors;
+
+@Service
+@Transactional
+public class ${entity_name}Service {
+
+    @Autowired
+    private ${entity_name}Repository ${entity_var}Repository;
+
+    public List<${entity_name}Response> findAll() {
+        return ${entity_var}Repository.findAll()
+                .stream()
+                .map(this::convertToResponse)
+                .collect(Collectors.toList());
+    }
+
+    public Page<${entity_name}Response> findAll(Pageable pageable) {
+        return ${entity_var}Repository.findAll(pageable)
+                .map(this::convertToResponse);
+    }
+
+    public Optional<${entity_name}Response> findById(Long id) {
+        return ${entity_var}Repository.findById(id)
+                .map(this::convertToResponse);
+    }
+
+    public ${entity_name}Response create(Create${entity_name}Request request) {
+        ${entity_name} entity = convertToEntity(request);
+        ${entity_name} saved = ${entity_var}Repository.save(entity);
+        return convertToResponse(saved);
+    }
+
+    public Optional<${entity_name}Response> update(Long id, Create${entity_name}Request request) {
+        return ${entity_var}Repository.findById(id)
+                .map(existing -> {
+                    updateEntityFromRequest(existing, request);
+                    ${entity_name} updated = ${entity_var}Repository.save(existing);
+                    return convertToResponse(updated);
+                });
+    }
+
+    public boolean delete(Long id) {
+        if (${entity_var}Repository.existsById(id)) {
+            ${entity_var}Repository.deleteById(id);
+            return true;
         }
+        return false;
+    }
 
-    async def handle_generate_entity(self, arguments: Dict[str, Any]):
-        """生成实体类"""
-        entity_name = arguments.get("entity_name", "")
-        fields = arguments.get("fields", [])
+    public long count() {
+        return ${entity_var}Repository.count();
+    }
 
-        # 简化的实体生成
-        entity_code = f"""package com.example.entity;
+    // 转换方法
+    private ${entity_name}Response convertToResponse(${entity_name} entity) {
+        ${entity_name}Response response = new ${entity_name}Response();
+        response.setId(entity.getId());
+        // TODO: 设置其他字段
+        response.setCreatedAt(entity.getCreatedAt());
+        response.setUpdatedAt(entity.getUpdatedAt());
+        return response;
+    }
 
-// import javax.persistence.*;
-// import java.time.LocalDateTime;
+    private ${entity_name} convertToEntity(Create${entity_name}Request request) {
+        ${entity_name} entity = new ${entity_name}();
+        // TODO: 从请求设置字段
+        return entity;
+    }
 
-@Entity
-@Table(name = "{entity_name.lower()}s")
-public class {entity_name} {{
-    @Id
-    @GeneratedValue(strategy = GenerationType.IDENTITY)
-    private Long id;
-"""
+    private void updateEntityFromRequest(${entity_name} entity, Create${entity_name}Request request) {
+        // TODO: 更新实体字段
+    }
+}""")
 
-        for field in fields:
-            field_name = field.get('name', 'field') if isinstance(field, dict) else str(field)
-            field_type = field.get('type', 'String') if isinstance(field, dict) else 'String'
-            entity_code += f"""
-    @Column(name = "{field_name}")
-    private {field_type} {field_name};
-"""
+_CONTROLLER_TEMPLATE = Template("""package ${package_name}.controller;
 
-        entity_code += """
-    // Getters and Setters
-    // ... (省略具体实现)
-}"""
+import ${package_name}.service.${entity_name}Service;
+import ${package_name}.dto.request.Create${entity_name}Request;
+import ${package_name}.dto.response.${entity_name}Response;
+import org.springframework.beans.factory.annotation.Autowired;
+import org.springframework.data.domain.Page;
+import org.springframework.data.domain.Pageable;
+import org.springframework.http.HttpStatus;
+import org.springframework.http.ResponseEntity;
+import org.springframework.web.bind.annotation.*;
 
-        return {
-            "status": "success",
-            "entity_code": entity_code,
-            "entity_name": entity_name
+import javax.validation.Valid;
+import java.util.List;
+
+@RestController
+@RequestMapping("/api/${entity_var}s")
+@CrossOrigin(origins = "*")
+public class ${entity_name}Controller {
+
+    @Autowired
+    private ${entity_name}Service ${entity_var}Service;
+
+    @GetMapping
+    public ResponseEntity<List<${entity_name}Response>> getAllEntities() {
+        List<${entity_name}Response> entities = ${entity_var}Service.findAll();
+        return ResponseEntity.ok(entities);
+    }
+
+    @GetMapping("/page")
+    public ResponseEntity<Page<${entity_name}Response>> getAllEntitiesPageable(Pageable pageable) {
+        Page<${entity_name}Response> entities = ${entity_var}Service.findAll(pageable);
+        return ResponseEntity.ok(entities);
+    }
+
+    @GetMapping("/{id}")
+    public ResponseEntity<${entity_name}Response> getEntityById(@PathVariable Long id) {
+        return ${entity_var}Service.findById(id)
+                .map(entity -> ResponseEntity.ok(entity))
+                .orElse(ResponseEntity.notFound().build());
+    }
+
+    @PostMapping
+    public ResponseEntity<${entity_name}Response> createEntity(@Valid @RequestBody Create${entity_name}Request request) {
+        ${entity_name}Response created = ${entity_var}Service.create(request);
+        return ResponseEntity.status(HttpStatus.CREATED).body(created);
+    }
+
+    @PutMapping("/{id}")
+    public ResponseEntity<${entity_name}Response> updateEntity(
+            @PathVariable Long id,
+            @Valid @RequestBody Create${entity_name}Request request) {
+        return ${entity_var}Service.update(id, request)
+                .map(entity -> ResponseEntity.ok(entity))
+                .orElse(ResponseEntity.notFound().build());
+    }
+
+    @DeleteMapping("/{id}")
+    public ResponseEntity<Void> deleteEntity(@PathVariable Long id) {
+        if (${entity_var}Service.delete(id)) {
+            return ResponseEntity.noContent().build();
         }
+        return ResponseEntity.notFound().build();
+    }
 
-    def _generate_entity_class(self, entity_name: str, fields: list, package_name: str) -> str:
-        """生成实体类"""
-        entity_code = f"""package {package_name}.entity;
+    @GetMapping("/count")
+    public ResponseEntity<Long> getCount() {
+        long count = ${entity_var}Service.count();
+        return ResponseEntity.ok(count);
+    }
+}""")
 
-import javax.persistence.*;
-import java.time.LocalDateTime;
+# 单个字段的代码片段（str.format 模板，Java 花括号需双写）
+_COLUMN_FIELD = """
+    @Column(name = "{name}")
+    private {type} {name};
+"""
 
-@Entity
-@Table(name = "{entity_name.lower()}s")
-public class {entity_name} {{
-    @Id
-    @GeneratedValue(strategy = GenerationType.IDENTITY)
-    private Long id;
+_PLAIN_FIELD = """
+    private {type} {name};
 """
 
-        # 添加字段
-        for field in fields:
-            field_name = field.get('name', 'field')
-            field_type = field.get('type', 'String')
-            entity_code += f"""
-    @Column(name = "{field_name}")
-    private {field_type} {field_name};
+_NOT_BLANK_FIELD = """
+    @NotBlank(message = "{name} cannot be blank")
+    @Size(max = 255, message = "{name} cannot exceed 255 characters")
+    private {type} {name};
 """
 
-        # 添加审计字段
-        entity_code += """
+_NOT_NULL_FIELD = """
+    @NotNull(message = "{name} cannot be null")
+    private {type} {name};
+"""
+
+_ACCESSORS = """
+    public {type} get{capitalized}() {{
+        return {name};
+    }}
+
+    public void set{capitalized}({type} {name}) {{
+        this.{name} = {name};
+    }}
+"""
+
+# 实体类和响应 DTO 共用的固定代码块（不含占位符的普通字符串，Java 花括号无需双写）
+_ENTITY_AUDIT_FIELDS = """
     @Column(name = "created_at")
     private LocalDateTime createdAt;
 
@@ -299,36 +447,25 @@ public class {entity_name} {{
     protected void onUpdate() {
         updatedAt = LocalDateTime.now();
     }
+"""
 
-    // Constructors
-    public {entity_name}() {{}}
+_RESPONSE_AUDIT_FIELDS = """
+    private LocalDateTime createdAt;
+    private LocalDateTime updatedAt;
+"""
 
+_ID_ACCESSORS = """
     // Getters and Setters
-    public Long getId() {{
+    public Long getId() {
         return id;
-    }}
+    }
 
-    public void setId(Long id) {{
+    public void setId(Long id) {
         this.id = id;
-    }}
-"""
-
-        # 生成字段的getter/setter
-        for field in fields:
-            field_name = field.get('name', 'field')
-            field_type = field.get('type', 'String')
-            capitalized_name = field_name.capitalize()
-            entity_code += f"""
-    public {field_type} get{capitalized_name}() {{
-        return {field_name};
-    }}
-
-    public void set{capitalized_name}({field_type} {field_name}) {{
-        this.{field_name} = {field_name};
-    }}
+    }
 """
 
-        entity_code += """
+_AUDIT_ACCESSORS = """
     public LocalDateTime getCreatedAt() {
         return createdAt;
     }
@@ -344,330 +481,454 @@ public class {entity_name} {{
     public void setUpdatedAt(LocalDateTime updatedAt) {
         this.updatedAt = updatedAt;
     }
-}"""
+"""
 
-        return entity_code
 
-    def _generate_repository_interface(self, entity_name: str, package_name: str) -> str:
-        """生成Repository接口"""
-        return f"""package {package_name}.repository;
+def _normalize_fields(fields: list) -> tuple:
+    """把字段定义规整为 ((字段名, 类型, 首字母大写的字段名), ...)
 
-import {package_name}.entity.{entity_name};
-import org.springframework.data.jpa.repository.JpaRepository;
-import org.springframework.data.jpa.repository.Query;
-import org.springframework.data.repository.query.Param;
-import org.springframework.stereotype.Repository;
+    每次请求只规整一次，各生成函数直接复用；结果可哈希，同时作为渲染缓存的键。
+    字段既可以是 {"name": ..., "type": ...}，也可以直接是字段名（类型默认为 String）。
+    """
+    normalized = []
+    for field in fields:
+        if isinstance(field, dict):
+            name = str(field.get('name', 'field'))
+            field_type = str(field.get('type', 'String'))
+        else:
+            name = str(field)
+            field_type = 'String'
+        # 只大写首字母，保留其余大小写（userId -> getUserId），符合 JavaBean 命名
+        normalized.append((name, field_type, name[:1].upper() + name[1:]))
+    return tuple(normalized)
 
-import java.util.List;
-import java.util.Optional;
 
-@Repository
-public interface {entity_name}Repository extends JpaRepository<{entity_name}, Long> {{
+# 渲染函数只依赖入参，按入参缓存渲染结果，重复生成同一实体时直接复用
+@lru_cache(maxsize=256)
+def _render_entity_class(entity_name: str, fields: tuple, package_name: str) -> str:
+    """渲染实体类"""
+    parts = [f"""package {package_name}.entity;
 
-    // 根据名称查找（假设有name字段）
-    Optional<{entity_name}> findByName(String name);
+import javax.persistence.*;
+import java.time.LocalDateTime;
 
-    // 分页查询活跃记录
-    @Query("SELECT e FROM {entity_name} e WHERE e.createdAt >= :startDate")
-    List<{entity_name}> findRecentRecords(@Param("startDate") java.time.LocalDateTime startDate);
+@Entity
+@Table(name = "{entity_name.lower()}s")
+public class {entity_name} {{
+    @Id
+    @GeneratedValue(strategy = GenerationType.IDENTITY)
+    private Long id;
+"""]
 
-    // 统计总数
-    @Query("SELECT COUNT(e) FROM {entity_name} e")
-    long countTotal();
-}}"""
+    # 添加字段
+    parts.extend(_COLUMN_FIELD.format(name=name, type=field_type)
+                 for name, field_type, _ in fields)
 
-    def _generate_service_class(self, entity_name: str, package_name: str) -> str:
-        """生成Service类"""
-        return f"""package {package_name}.service;
+    # 添加审计字段、构造函数和 id 的getter/setter
+    parts.append(_ENTITY_AUDIT_FIELDS)
+    parts.append(f"""
+    // Constructors
+    public {entity_name}() {{}}
+""")
+    parts.append(_ID_ACCESSORS)
 
-import {package_name}.entity.{entity_name};
-import {package_name}.repository.{entity_name}Repository;
-import {package_name}.dto.request.Create{entity_name}Request;
-import {package_name}.dto.response.{entity_name}Response;
-import org.springframework.beans.factory.annotation.Autowired;
-import org.springframework.data.domain.Page;
-import org.springframework.data.domain.Pageable;
-import org.springframework.stereotype.Service;
-import org.springframework.transaction.annotation.Transactional;
+    # 生成字段的getter/setter
+    parts.extend(_ACCESSORS.format(name=name, type=field_type, capitalized=capitalized)
+                 for name, field_type, capitalized in fields)
 
-import java.util.List;
-import java.util.Optional;
-import java.util.stream.Collectors;
+    parts.append(_AUDIT_ACCESSORS)
+    parts.append("}")
 
-@Service
-@Transactional
-public class {entity_name}Service {{
+    return "".join(parts)
 
-    @Autowired
-    private {entity_name}Repository {entity_name.lower()}Repository;
 
-    public List<{entity_name}Response> findAll() {{
-        return {entity_name.lower()}Repository.findAll()
-                .stream()
-                .map(this::convertToResponse)
-                .collect(Collectors.toList());
-    }}
+@lru_cache(maxsize=256)
+def _render_repository_interface(entity_name: str, package_name: str) -> str:
+    """渲染Repository接口"""
+    return _REPOSITORY_TEMPLATE.substitute(entity_name=entity_name, package_name=package_name)
 
-    public Page<{entity_name}Response> findAll(Pageable pageable) {{
-        return {entity_name.lower()}Repository.findAll(pageable)
-                .map(this::convertToResponse);
-    }}
 
-    public Optional<{entity_name}Response> findById(Long id) {{
-        return {entity_name.lower()}Repository.findById(id)
-                .map(this::convertToResponse);
-    }}
+@lru_cache(maxsize=256)
+def _render_service_class(entity_name: str, package_name: str) -> str:
+    """渲染Service类"""
+    return _SERVICE_TEMPLATE.substitute(entity_name=entity_name,
+                                        entity_var=entity_name.lower(),
+                                        package_name=package_name)
 
-    public {entity_name}Response create(Create{entity_name}Request request) {{
-        {entity_name} entity = convertToEntity(request);
-        {entity_name} saved = {entity_name.lower()}Repository.save(entity);
-        return convertToResponse(saved);
-    }}
 
-    public Optional<{entity_name}Response> update(Long id, Create{entity_name}Request request) {{
-        return {entity_name.lower()}Repository.findById(id)
-                .map(existing -> {{
-                    updateEntityFromRequest(existing, request);
-                    {entity_name} updated = {entity_name.lower()}Repository.save(existing);
-                    return convertToResponse(updated);
-                }});
-    }}
+@lru_cache(maxsize=256)
+def _render_controller_class(entity_name: str, package_name: str) -> str:
+    """渲染Controller类"""
+    return _CONTROLLER_TEMPLATE.substitute(entity_name=entity_name,
+                                           entity_var=entity_name.lower(),
+                                           package_name=package_name)
 
-    public boolean delete(Long id) {{
-        if ({entity_name.lower()}Repository.existsById(id)) {{
-            {entity_name.lower()}Repository.deleteById(id);
-            return true;
-        }}
-        return false;
-    }}
 
-    public long count() {{
-        return {entity_name.lower()}Repository.count();
-    }}
+@lru_cache(maxsize=256)
+def _render_request_dto(entity_name: str, fields: tuple, package_name: str) -> str:
+    """渲染请求DTO类"""
+    parts = [f"""package {package_name}.dto.request;
 
-    // 转换方法
-    private {entity_name}Response convertToResponse({entity_name} entity) {{
-        {entity_name}Response response = new {entity_name}Response();
-        response.setId(entity.getId());
-        // TODO: 设置其他字段
-        response.setCreatedAt(entity.getCreatedAt());
-        response.setUpdatedAt(entity.getUpdatedAt());
-        return response;
-    }}
+import javax.validation.constraints.*;
 
-    private {entity_name} convertToEntity(Create{entity_name}Request request) {{
-        {entity_name} entity = new {entity_name}();
-        // TODO: 从请求设置字段
-        return entity;
-    }}
+public class Create{entity_name}Request {{
+"""]
 
-    private void updateEntityFromRequest({entity_name} entity, Create{entity_name}Request request) {{
-        // TODO: 更新实体字段
-    }}
-}}"""
+    # 添加字段（String 类型使用 @NotBlank/@Size，其余类型使用 @NotNull）
+    parts.extend((_NOT_BLANK_FIELD if field_type == 'String' else _NOT_NULL_FIELD)
+                 .format(name=name, type=field_type)
+                 for name, field_type, _ in fields)
 
-    def _generate_controller_class(self, entity_name: str, package_name: str) -> str:
-        """生成Controller类"""
-        return f"""package {package_name}.controller;
+    # 添加构造函数和getter/setter
+    parts.append(f"""
+    public Create{entity_name}Request() {{}}
 
-import {package_name}.service.{entity_name}Service;
-import {package_name}.dto.request.Create{entity_name}Request;
-import {package_name}.dto.response.{entity_name}Response;
-import org.springframework.beans.factory.annotation.Autowired;
-import org.springframework.data.domain.Page;
-import org.springframework.data.domain.Pageable;
-import org.springframework.http.HttpStatus;
-import org.springframework.http.ResponseEntity;
-import org.springframework.web.bind.annotation.*;
+    // Getters and Setters
+""")
 
-import javax.validation.Valid;
-import java.util.List;
+    parts.extend(_ACCESSORS.format(name=name, type=field_type, capitalized=capitalized)
+                 for name, field_type, capitalized in fields)
+
+    parts.append("}")
+    return "".join(parts)
+
+
+@lru_cache(maxsize=256)
+def _render_response_dto(entity_name: str, fields: tuple, package_name: str) -> str:
+    """渲染响应DTO类"""
+    parts = [f"""package {package_name}.dto.response;
+
+import java.time.LocalDateTime;
+
+public class {entity_name}Response {{
+
+    private Long id;
+"""]
+
+    # 添加字段
+    parts.extend(_PLAIN_FIELD.format(name=name, type=field_type)
+                 for name, field_type, _ in fields)
+
+    # 添加审计字段、构造函数和 id 的getter/setter
+    parts.append(_RESPONSE_AUDIT_FIELDS)
+    parts.append(f"""
+    public {entity_name}Response() {{}}
+""")
+    parts.append(_ID_ACCESSORS)
+
+    # 生成字段的getter/setter
+    parts.extend(_ACCESSORS.format(name=name, type=field_type, capitalized=capitalized)
+                 for name, field_type, capitalized in fields)
+
+    parts.append(_AUDIT_ACCESSORS)
+    parts.append("}")
+
+    return "".join(parts)
+
+
+# 工具定义：只读，模块加载时构建一次，所有实例共享
+_TOOLS_SCHEMA = {
+    "generate_crud_module": {
+                "description": "生成完整的CRUD模块",
+                "parameters": {
+                            "type": "object",
+                            "properties": {
+                                        "entity_name": {
+                                                    "type": "string",
+                                                    "description": "实体名称"
+                                        },
+                                        "fields": {
+                                                    "type": "array",
+                                                    "description": "字段定义",
+                                                    "items": {
+                                                                "type": "object",
+                                                                "properties": {
+                                                                            "name": {
+                                                                                        "type": "string"
+                                                                            },
+                                                                            "type": {
+                                                                                        "type": "string"
+                                                                            }
+                                                                }
+                                                    }
+                                        },
+                                        "project_path": {
+                                                    "type": "string",
+                                                    "description": "项目根目录路径，默认为当前目录"
+                                        },
+                                        "package_name": {
+                                                    "type": "string",
+                                                    "description": "包名，如果不指定将自动分析项目结构推断"
+                                        }
+                            },
+                            "required": [
+                                        "entity_name",
+                                        "fields"
+                            ]
+                }
+    },
+    "generate_entity": {
+                "description": "生成实体类",
+                "parameters": {
+                            "type": "object",
+                            "properties": {
+                                        "entity_name": {
+                                                    "type": "string",
+                                                    "description": "实体名称"
+                                        },
+                                        "fields": {
+                                                    "type": "array",
+                                                    "description": "字段定义"
+                                        }
+                            },
+                            "required": [
+                                        "entity_name",
+                                        "fields"
+                            ]
+                }
+    }
+}
+
+# tools/list 的响应内容只依赖工具定义，预先构建
+_TOOLS_LIST = [
+    {
+        "name": name,
+        "description": tool_info["description"],
+        "inputSchema": tool_info["parameters"]
+    }
+    for name, tool_info in _TOOLS_SCHEMA.items()
+]
+
+
+class 代码生成MCP服务器Server:
+    def __init__(self):
+        self.tools = _TOOLS_SCHEMA
+        # 工具名 -> 处理方法，初始化时构建一次，调用时只需一次字典查找
+        self._handlers = {}
+        for name in self.tools:
+            handler = getattr(self, f"handle_{name}", None)
+            if handler is not None:
+                self._handlers[name] = handler
+        # Java 文件解析缓存：源码目录绝对路径 -> {文件路径: ((修改时间, 大小), 解析结果)}
+        self._parse_cache = {}
+    
+    async def handle_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """处理 MCP 请求"""
+        method = request.get("method")
+        params = request.get("params", {})
+        request_id = request.get("id")
+        
+        try:
+            if method == "initialize":
+                return {
+                    "jsonrpc": "2.0",
+                    "id": request_id,
+                    "result": {
+                        "protocolVersion": "2024-11-05",
+                        "capabilities": {"tools": {}},
+                        "serverInfo": {
+                            "name": "代码生成MCP服务器",
+                            "version": "1.0.0"
+                        }
+                    }
+                }
+            
+            elif method == "tools/list":
+                return {
+                    "jsonrpc": "2.0",
+                    "id": request_id,
+                    "result": {"tools": _TOOLS_LIST}
+                }
+            
+            elif method == "tools/call":
+                tool_name = params.get("name")
+                arguments = params.get("arguments", {})
+                
+                # 调用对应的工具方法
+                handler = self._handlers.get(tool_name)
+                if handler is not None:
+                    result = await handler(arguments)
+                else:
+                    result = await self.handle_default_tool(tool_name, arguments)
+                
+                return {
+                    "jsonrpc": "2.0",
+                    "id": request_id,
+                    "result": {
+                        "content": [{
+                            "type": "text",
+                            "text": _RESULT_ENCODER.encode(result)
+                        }]
+                    }
+                }
+            
+            else:
+                raise ValueError(f"Unknown method: {method}")
+        
+        except Exception as e:
+            return {
+                "jsonrpc": "2.0",
+                "id": request_id,
+                "error": {
+                    "code": -32000,
+                    "message": str(e)
+                }
+            }
+    
+    async def handle_request_bytes(self, raw: bytes) -> bytes:
+        """处理一行原始 JSON-RPC 请求，返回编码后的响应（不含换行）"""
+        # json.loads 直接接受 bytes；json.dumps 默认只输出 ASCII，可按 ASCII 快速编码
+        response = await self.handle_request(json.loads(raw))
+        return json.dumps(response).encode('ascii')
 
-@RestController
-@RequestMapping("/api/{entity_name.lower()}s")
-@CrossOrigin(origins = "*")
-public class {entity_name}Controller {{
+    async def handle_default_tool(self, tool_name: str, arguments: Dict[str, Any]):
+        """默认工具处理器"""
+        return {
+            "status": "success",
+            "tool": tool_name,
+            "message": f"{tool_name} 执行成功",
+            "arguments": arguments,
+            "result": "功能正常，等待具体实现"
+        }
 
-    @Autowired
-    private {entity_name}Service {entity_name.lower()}Service;
+    async def handle_generate_crud_module(self, arguments: Dict[str, Any]):
+        """生成完整的CRUD模块"""
+        entity_name = arguments.get("entity_name", "")
+        fields = arguments.get("fields", [])
+        project_path = arguments.get("project_path", ".")
+        package_name = arguments.get("package_name", None)
 
-    @GetMapping
-    public ResponseEntity<List<{entity_name}Response>> getAllEntities() {{
-        List<{entity_name}Response> entities = {entity_name.lower()}Service.findAll();
-        return ResponseEntity.ok(entities);
-    }}
+        # 智能分析项目结构
+        project_info = self._analyze_project_structure(project_path)
 
-    @GetMapping("/page")
-    public ResponseEntity<Page<{entity_name}Response>> getAllEntitiesPageable(Pageable pageable) {{
-        Page<{entity_name}Response> entities = {entity_name.lower()}Service.findAll(pageable);
-        return ResponseEntity.ok(entities);
-    }}
+        # 如果没有指定包名，使用分析得到的包名
+        if not package_name:
+            package_name = project_info.get("base_package", "com.example")
 
-    @GetMapping("/{{id}}")
-    public ResponseEntity<{entity_name}Response> getEntityById(@PathVariable Long id) {{
-        return {entity_name.lower()}Service.findById(id)
-                .map(entity -> ResponseEntity.ok(entity))
-                .orElse(ResponseEntity.notFound().build());
-    }}
+        # 字段定义只规整一次，供实体和 DTO 的生成共用
+        normalized_fields = _normalize_fields(fields)
 
-    @PostMapping
-    public ResponseEntity<{entity_name}Response> createEntity(@Valid @RequestBody Create{entity_name}Request request) {{
-        {entity_name}Response created = {entity_name.lower()}Service.create(request);
-        return ResponseEntity.status(HttpStatus.CREATED).body(created);
-    }}
+        # 生成文件内容
+        generated_files = {
+            "entity": {},
+            "repository": {},
+            "service": {},
+            "controller": {},
+            "dto/request": {},
+            "dto/response": {}
+        }
 
-    @PutMapping("/{{id}}")
-    public ResponseEntity<{entity_name}Response> updateEntity(
-            @PathVariable Long id,
-            @Valid @RequestBody Create{entity_name}Request request) {{
-        return {entity_name.lower()}Service.update(id, request)
-                .map(entity -> ResponseEntity.ok(entity))
-                .orElse(ResponseEntity.notFound().build());
-    }}
+        # 1. 生成实体类
+        entity_code = self._generate_entity_class(entity_name, normalized_fields, package_name)
+        generated_files["entity"][f"{entity_name}.java"] = entity_code
 
-    @DeleteMapping("/{{id}}")
-    public ResponseEntity<Void> deleteEntity(@PathVariable Long id) {{
-        if ({entity_name.lower()}Service.delete(id)) {{
-            return ResponseEntity.noContent().build();
-        }}
-        return ResponseEntity.notFound().build();
-    }}
+        # 2. 生成Repository接口
+        repository_code = self._generate_repository_interface(entity_name, package_name)
+        generated_files["repository"][f"{entity_name}Repository.java"] = repository_code
 
-    @GetMapping("/count")
-    public ResponseEntity<Long> getCount() {{
-        long count = {entity_name.lower()}Service.count();
-        return ResponseEntity.ok(count);
-    }}
-}}"""
+        # 3. 生成Service类
+        service_code = self._generate_service_class(entity_name, package_name)
+        generated_files["service"][f"{entity_name}Service.java"] = service_code
 
-    def _generate_request_dto(self, entity_name: str, fields: list, package_name: str) -> str:
-        """生成请求DTO类"""
-        dto_code = f"""package {package_name}.dto.request;
+        # 4. 生成Controller类
+        controller_code = self._generate_controller_class(entity_name, package_name)
+        generated_files["controller"][f"{entity_name}Controller.java"] = controller_code
 
-import javax.validation.constraints.*;
+        # 5. 生成DTO类
+        request_dto_code = self._generate_request_dto(entity_name, normalized_fields, package_name)
+        response_dto_code = self._generate_response_dto(entity_name, normalized_fields, package_name)
+        generated_files["dto/request"][f"Create{entity_name}Request.java"] = request_dto_code
+        generated_files["dto/response"][f"{entity_name}Response.java"] = response_dto_code
 
-public class Create{entity_name}Request {{
-"""
+        # 保存生成的文件到学习到的项目结构
+        saved_files = self._save_files_to_learned_structure(generated_files, project_info, package_name)
 
-        # 添加字段
-        for field in fields:
-            field_name = field.get('name', 'field')
-            field_type = field.get('type', 'String')
-
-            # 添加验证注解
-            if field_type == 'String':
-                dto_code += f"""
-    @NotBlank(message = "{field_name} cannot be blank")
-    @Size(max = 255, message = "{field_name} cannot exceed 255 characters")
-    private {field_type} {field_name};
-"""
+        # 转换 project_info 中的 Path 对象为字符串
+        serializable_project_info = {}
+        for key, value in project_info.items():
+            if key == "resolved_layer_dirs":
+                continue  # 保存文件用的内部查找表，不属于返回结果
+            if hasattr(value, '__fspath__'):  # Path 对象
+                serializable_project_info[key] = str(value)
+            elif key == "layer_patterns":
+                # 计数器和去重集合按出现顺序转换为列表
+                serializable_project_info[key] = {
+                    layer: {name: list(items) for name, items in patterns.items()}
+                    for layer, patterns in value.items()
+                }
             else:
-                dto_code += f"""
-    @NotNull(message = "{field_name} cannot be null")
-    private {field_type} {field_name};
-"""
-
-        # 添加构造函数和getter/setter
-        dto_code += f"""
-    public Create{entity_name}Request() {{}}
-
-    // Getters and Setters
-"""
-
-        for field in fields:
-            field_name = field.get('name', 'field')
-            field_type = field.get('type', 'String')
-            capitalized_name = field_name.capitalize()
-            dto_code += f"""
-    public {field_type} get{capitalized_name}() {{
-        return {field_name};
-    }}
-
-    public void set{capitalized_name}({field_type} {field_name}) {{
-        this.{field_name} = {field_name};
-    }}
-"""
+                serializable_project_info[key] = value
 
-        dto_code += "}"
-        return dto_code
+        return {
+            "status": "success",
+            "message": f"成功生成完整的CRUD模块，包含 {len(saved_files)} 个文件",
+            "files": saved_files,
+            "project_info": serializable_project_info,
+            "package_name": package_name,
+            "components": ["Entity", "Repository", "Service", "Controller", "DTOs"]
+        }
 
-    def _generate_response_dto(self, entity_name: str, fields: list, package_name: str) -> str:
-        """生成响应DTO类"""
-        dto_code = f"""package {package_name}.dto.response;
+    async def handle_generate_entity(self, arguments: Dict[str, Any]):
+        """生成实体类"""
+        entity_name = arguments.get("entity_name", "")
+        fields = arguments.get("fields", [])
 
-import java.time.LocalDateTime;
+        # 简化的实体生成
+        parts = [f"""package com.example.entity;
 
-public class {entity_name}Response {{
+// import javax.persistence.*;
+// import java.time.LocalDateTime;
 
+@Entity
+@Table(name = "{entity_name.lower()}s")
+public class {entity_name} {{
+    @Id
+    @GeneratedValue(strategy = GenerationType.IDENTITY)
     private Long id;
-"""
-
-        # 添加字段
-        for field in fields:
-            field_name = field.get('name', 'field')
-            field_type = field.get('type', 'String')
-            dto_code += f"""
-    private {field_type} {field_name};
-"""
-
-        # 添加审计字段
-        dto_code += """
-    private LocalDateTime createdAt;
-    private LocalDateTime updatedAt;
+"""]
 
-    public {entity_name}Response() {{}}
+        parts.extend(_COLUMN_FIELD.format(name=name, type=field_type)
+                     for name, field_type, _ in _normalize_fields(fields))
 
+        parts.append("""
     // Getters and Setters
-    public Long getId() {{
-        return id;
-    }}
-
-    public void setId(Long id) {{
-        this.id = id;
-    }}
-"""
+    // ... (省略具体实现)
+}""")
 
-        # 生成字段的getter/setter
-        for field in fields:
-            field_name = field.get('name', 'field')
-            field_type = field.get('type', 'String')
-            capitalized_name = field_name.capitalize()
-            dto_code += f"""
-    public {field_type} get{capitalized_name}() {{
-        return {field_name};
-    }}
+        return {
+            "status": "success",
+            "entity_code": "".join(parts),
+            "entity_name": entity_name
+        }
 
-    public void set{capitalized_name}({field_type} {field_name}) {{
-        this.{field_name} = {field_name};
-    }}
-"""
+    def _generate_entity_class(self, entity_name: str, fields: tuple, package_name: str) -> str:
+        """生成实体类"""
+        return _render_entity_class(entity_name, fields, package_name)
 
-        dto_code += """
-    public LocalDateTime getCreatedAt() {
-        return createdAt;
-    }
+    def _generate_repository_interface(self, entity_name: str, package_name: str) -> str:
+        """生成Repository接口"""
+        return _render_repository_interface(entity_name, package_name)
 
-    public void setCreatedAt(LocalDateTime createdAt) {
-        this.createdAt = createdAt;
-    }
+    def _generate_service_class(self, entity_name: str, package_name: str) -> str:
+        """生成Service类"""
+        return _render_service_class(entity_name, package_name)
 
-    public LocalDateTime getUpdatedAt() {
-        return updatedAt;
-    }
+    def _generate_controller_class(self, entity_name: str, package_name: str) -> str:
+        """生成Controller类"""
+        return _render_controller_class(entity_name, package_name)
 
-    public void setUpdatedAt(LocalDateTime updatedAt) {
-        this.updatedAt = updatedAt;
-    }
-}"""
+    def _generate_request_dto(self, entity_name: str, fields: tuple, package_name: str) -> str:
+        """生成请求DTO类"""
+        return _render_request_dto(entity_name, fields, package_name)
 
-        return dto_code
+    def _generate_response_dto(self, entity_name: str, fields: tuple, package_name: str) -> str:
+        """生成响应DTO类"""
+        return _render_response_dto(entity_name, fields, package_name)
 
     def _analyze_project_structure(self, project_path: str) -> Dict[str, Any]:
         """深度分析项目结构，学习项目规范和习惯"""
-        import os
-        from pathlib import Path
-
         project_root = Path(project_path)
+
         project_info = {
             "base_package": "com.example",
             "src_main_java": None,
@@ -676,12 +937,10 @@ public class {entity_name}Response {{
             "existing_packages": [],
             "project_root": project_path,
             # 新增：项目结构学习
+            # dirs 统计每个目录下的类数量；naming/annotations 用 dict 做按出现顺序去重的集合
             "layer_patterns": {
-                "entity": {"dirs": [], "naming": [], "annotations": []},
-                "repository": {"dirs": [], "naming": [], "annotations": []},
-                "service": {"dirs": [], "naming": [], "annotations": []},
-                "controller": {"dirs": [], "naming": [], "annotations": []},
-                "dto": {"dirs": [], "naming": [], "annotations": []}
+                layer: {"dirs": Counter(), "naming": {}, "annotations": {}}
+                for layer in ("entity", "repository", "service", "controller", "dto")
             },
             "project_conventions": {
                 "entity_suffix": "Entity",
@@ -695,314 +954,232 @@ public class {entity_name}Response {{
                 "orm": "unknown",  # jpa, mybatis, etc.
                 "web": "unknown",  # spring-mvc, spring-webflux, etc.
                 "validation": "unknown"  # javax.validation, hibernate-validator, etc.
-            }
+            },
+            # 分析完成后汇总：每层采用的目录，见 _resolve_layer_settings
+            "resolved_layer_dirs": {}
         }
 
+        standard_src = project_root / "src" / "main" / "java"
+
         # 检查是否是 Maven 项目
         if (project_root / "pom.xml").exists():
             project_info["has_maven"] = True
-            project_info["src_main_java"] = project_root / "src" / "main" / "java"
+            project_info["src_main_java"] = standard_src
 
         # 检查是否是 Gradle 项目
         if (project_root / "build.gradle").exists() or (project_root / "build.gradle.kts").exists():
             project_info["has_gradle"] = True
             if not project_info["src_main_java"]:
-                project_info["src_main_java"] = project_root / "src" / "main" / "java"
+                project_info["src_main_java"] = standard_src
+
+        # 项目路径不存在（通常是路径传错）：直接返回默认结构，不扫描
+        if not project_info["src_main_java"] and not project_root.is_dir():
+            project_info["src_main_java"] = standard_src
+            self._resolve_layer_settings(project_info)
+            return project_info
+
+        # 没有构建文件但已有标准源码目录，直接使用，无需遍历查找
+        if not project_info["src_main_java"] and standard_src.is_dir():
+            project_info["src_main_java"] = standard_src
 
         # 如果没有标准结构，查找 java 文件
         if not project_info["src_main_java"]:
-            java_dirs = []
-            for root, dirs, files in os.walk(project_root):
-                if any(f.endswith('.java') for f in files):
-                    java_dirs.append(Path(root))
-
-            if java_dirs:
-                # 选择最浅的目录作为源码目录的父目录
-                project_info["src_main_java"] = java_dirs[0].parent / "src" / "main" / "java"
+            # 只需要找到第一个 Java 文件，找到即停止遍历
+            first_java = next(_iter_java_files(project_root, _SKIP_DIRS), None)
+
+            if first_java is not None:
+                # 选择最先找到的 Java 文件所在目录的父目录
+                project_info["src_main_java"] = first_java.parent.parent / "src" / "main" / "java"
             else:
                 # 默认创建标准 Maven 结构
-                project_info["src_main_java"] = project_root / "src" / "main" / "java"
+                project_info["src_main_java"] = standard_src
 
         # 深度分析现有项目结构和规范
         if project_info["src_main_java"] and project_info["src_main_java"].exists():
             try:
                 # 扫描所有 Java 文件，学习项目结构
-                for root, dirs, files in os.walk(project_info["src_main_java"]):
-                    for file in files:
-                        if file.endswith('.java'):
-                            java_file = Path(root) / file
-                            self._learn_from_java_file(java_file, project_info)
+                java_files = list(_iter_java_files(project_info["src_main_java"]))
+
+                # 读取和解析并行执行（未变化的文件直接复用上次的解析结果），
+                # 汇总仍按文件顺序在当前线程完成，无需加锁
+                parsed_files = self._parse_project_sources(project_info["src_main_java"], java_files)
+                for java_file, parsed in zip(java_files, parsed_files):
+                    if parsed is not None:
+                        self._learn_from_java_file(java_file, parsed, project_info)
 
                 # 分析学习结果，推断项目规范
                 self._infer_project_conventions(project_info)
 
                 # 使用最常见的包名作为基础包名
-                if project_info["existing_packages"]:
-                    # 找到最短的包名作为基础包名
-                    base_packages = [pkg.split('.') for pkg in project_info["existing_packages"]]
-                    if base_packages:
-                        # 找到公共前缀
-                        common_parts = []
-                        min_length = min(len(parts) for parts in base_packages)
-                        for i in range(min_length):
-                            parts_at_i = [parts[i] for parts in base_packages]
-                            if len(set(parts_at_i)) == 1:  # 所有包在这个位置都相同
-                                common_parts.append(parts_at_i[0])
-                            else:
-                                break
-
-                        if len(common_parts) >= 2:  # 至少有 com.example 这样的结构
-                            project_info["base_package"] = '.'.join(common_parts)
+                packages = project_info["existing_packages"]
+                if packages:
+                    # 找到公共前缀：'.' 比包名中的其他字符都小，按字符串排序与按段排序一致，
+                    # 所有包名的公共前缀就是字典序最小和最大两个包名的公共前缀
+                    common_parts = os.path.commonprefix([min(packages).split('.'),
+                                                         max(packages).split('.')])
+
+                    if len(common_parts) >= 2:  # 至少有 com.example 这样的结构
+                        project_info["base_package"] = '.'.join(common_parts)
             except Exception:
                 pass  # 如果分析失败，使用默认值
 
+        self._resolve_layer_settings(project_info)
         return project_info
 
-    def _extract_package_from_java_file(self, java_file) -> str:
-        """从 Java 文件中提取包名"""
-        try:
-            with open(java_file, 'r', encoding='utf-8') as f:
-                for line in f:
-                    line = line.strip()
-                    if line.startswith('package ') and line.endswith(';'):
-                        return line[8:-1].strip()  # 去掉 'package ' 和 ';'
-        except Exception:
-            pass
-        return None
-
-    def _save_files_to_project_structure(self, generated_files: Dict[str, Dict[str, str]],
-                                       project_info: Dict[str, Any], package_name: str) -> list:
-        """将生成的文件保存到正确的项目结构中"""
-        import os
-        from pathlib import Path
-
-        saved_files = []
-        src_main_java = project_info["src_main_java"]
-
-        # 确保源码目录存在
-        src_main_java.mkdir(parents=True, exist_ok=True)
-
-        # 将包名转换为目录路径
-        package_path = src_main_java / package_name.replace('.', os.sep)
-
-        for layer, files in generated_files.items():
-            if not files:  # 跳过空的层
-                continue
-
-            # 创建对应的目录结构
-            layer_path = package_path / layer
-            layer_path.mkdir(parents=True, exist_ok=True)
+    def _parse_project_sources(self, src_root, java_files: list) -> list:
+        """解析源码目录下的 Java 文件，结果与 java_files 一一对应
 
-            for filename, content in files.items():
-                file_path = layer_path / filename
+        按修改时间和文件大小缓存每个文件的解析结果，再次分析同一项目时
+        只重新解析新增或改动过的文件（包括本工具刚写入的文件）。
+        """
+        cache_key = str(Path(src_root).absolute())
+        cached = self._parse_cache.get(cache_key, {})
+        entries = {}
+        results = [None] * len(java_files)
+        stale = []
 
-                # 保存文件
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    f.write(content)
+        for index, java_file in enumerate(java_files):
+            path = str(java_file)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue  # 文件已被删除，跳过
+            stamp = (stat.st_mtime_ns, stat.st_size)
+            hit = cached.get(path)
+            if hit is not None and hit[0] == stamp:
+                results[index] = hit[1]
+                entries[path] = hit
+            else:
+                stale.append((index, path, stamp))
 
-                # 记录保存的文件路径（相对于项目根目录）
-                try:
-                    relative_path = file_path.relative_to(Path(project_info["project_root"]))
-                    saved_files.append(str(relative_path))
-                except ValueError:
-                    # 如果无法计算相对路径，使用绝对路径
-                    saved_files.append(str(file_path))
+        if stale:
+            parsed_files = _parse_java_files([java_files[index] for index, _, _ in stale])
+            for (index, path, stamp), parsed in zip(stale, parsed_files):
+                results[index] = parsed
+                if parsed is not None:
+                    entries[path] = (stamp, parsed)
 
-        return saved_files
+        # 只保留本次扫描到的文件，已删除文件的结果不会一直留在缓存中
+        self._parse_cache[cache_key] = entries
+        return results
 
-    def _learn_from_java_file(self, java_file, project_info):
-        """从单个 Java 文件学习项目规范"""
+    def _learn_from_java_file(self, java_file, parsed, project_info):
+        """从单个 Java 文件的解析结果（见 _parse_java_file）学习项目规范"""
         try:
-            with open(java_file, 'r', encoding='utf-8') as f:
-                content = f.read()
-
-            # 提取包名
-            package_name = None
-            class_name = None
-            annotations = []
-
-            for line in content.split('\n'):
-                line = line.strip()
-
-                # 提取包名
-                if line.startswith('package ') and line.endswith(';'):
-                    package_name = line[8:-1].strip()
-                    if package_name not in project_info["existing_packages"]:
-                        project_info["existing_packages"].append(package_name)
-
-                # 提取类名
-                if line.startswith('public class ') or line.startswith('public interface '):
-                    parts = line.split()
-                    if len(parts) >= 3:
-                        class_name = parts[2].split('<')[0]  # 处理泛型
-
-                # 提取注解
-                if line.startswith('@'):
-                    annotation = line.split('(')[0]  # 去掉参数部分
-                    annotations.append(annotation)
+            packages, class_name, annotations, mentions_mybatis = parsed
+
+            # 记录包名
+            for package_name in packages:
+                if package_name not in project_info["existing_packages"]:
+                    project_info["existing_packages"].append(package_name)
+            package_name = packages[-1] if packages else None
 
             if package_name and class_name:
                 # 分析这个类属于哪一层
-                layer = self._identify_layer(package_name, class_name, annotations, content)
+                layer = self._identify_layer(package_name, class_name, annotations)
                 if layer:
+                    patterns = project_info["layer_patterns"][layer]
+
                     # 记录目录位置
                     relative_dir = java_file.parent.relative_to(project_info["src_main_java"])
-                    if str(relative_dir) not in project_info["layer_patterns"][layer]["dirs"]:
-                        project_info["layer_patterns"][layer]["dirs"].append(str(relative_dir))
+                    patterns["dirs"][str(relative_dir)] += 1
 
                     # 记录命名模式
-                    if class_name not in project_info["layer_patterns"][layer]["naming"]:
-                        project_info["layer_patterns"][layer]["naming"].append(class_name)
+                    patterns["naming"][class_name] = None
 
                     # 记录注解模式
-                    for annotation in annotations:
-                        if annotation not in project_info["layer_patterns"][layer]["annotations"]:
-                            project_info["layer_patterns"][layer]["annotations"].append(annotation)
+                    patterns["annotations"].update(dict.fromkeys(annotations))
 
                     # 分析框架信息
-                    self._analyze_framework_info(annotations, content, project_info)
+                    self._analyze_framework_info(annotations, mentions_mybatis, project_info)
 
         except Exception:
             pass  # 忽略单个文件的分析错误
 
-    def _identify_layer(self, package_name, class_name, annotations, content):
+    def _identify_layer(self, package_name, class_name, annotations):
         """识别类属于哪一层"""
-        package_lower = package_name.lower()
-        class_lower = class_name.lower()
-
         # 基于包名判断
-        if 'entity' in package_lower or 'model' in package_lower or 'domain' in package_lower:
-            return 'entity'
-        elif 'repository' in package_lower or 'dao' in package_lower or 'mapper' in package_lower:
-            return 'repository'
-        elif 'service' in package_lower:
-            return 'service'
-        elif 'controller' in package_lower or 'web' in package_lower or 'rest' in package_lower:
-            return 'controller'
-        elif 'dto' in package_lower or 'vo' in package_lower or 'request' in package_lower or 'response' in package_lower:
-            return 'dto'
+        layer = _package_layer(package_name)
+        if layer:
+            return layer
 
         # 基于类名判断
-        if class_lower.endswith('entity') or class_lower.endswith('model'):
-            return 'entity'
-        elif class_lower.endswith('repository') or class_lower.endswith('dao') or class_lower.endswith('mapper'):
-            return 'repository'
-        elif class_lower.endswith('service') or class_lower.endswith('serviceimpl'):
-            return 'service'
-        elif class_lower.endswith('controller') or class_lower.endswith('resource'):
-            return 'controller'
-        elif class_lower.endswith('dto') or class_lower.endswith('vo') or class_lower.endswith('request') or class_lower.endswith('response'):
-            return 'dto'
+        class_lower = class_name.lower()
+        for suffixes, layer in _CLASS_SUFFIX_LAYERS:
+            if class_lower.endswith(suffixes):
+                return layer
 
         # 基于注解判断
         for annotation in annotations:
-            if annotation in ['@Entity', '@Table']:
-                return 'entity'
-            elif annotation in ['@Repository', '@Mapper']:
-                return 'repository'
-            elif annotation in ['@Service', '@Component']:
-                return 'service'
-            elif annotation in ['@Controller', '@RestController']:
-                return 'controller'
+            layer = _ANNOTATION_LAYERS.get(annotation)
+            if layer:
+                return layer
 
         return None
 
-    def _analyze_framework_info(self, annotations, content, project_info):
+    def _analyze_framework_info(self, annotations, mentions_mybatis, project_info):
         """分析使用的框架信息"""
         # 分析 ORM 框架
-        if any(ann in annotations for ann in ['@Entity', '@Table', '@Id']):
+        if not _JPA_ANNOTATIONS.isdisjoint(annotations):
             project_info["framework_info"]["orm"] = "jpa"
-        elif '@Mapper' in annotations or 'mybatis' in content.lower():
+        elif '@Mapper' in annotations or mentions_mybatis:
             project_info["framework_info"]["orm"] = "mybatis"
 
         # 分析 Web 框架
-        if '@RestController' in annotations or '@Controller' in annotations:
+        if not _WEB_ANNOTATIONS.isdisjoint(annotations):
             project_info["framework_info"]["web"] = "spring-mvc"
 
-        # 分析验证框架
-        if any(ann.startswith('@Valid') or ann.startswith('@NotNull') or ann.startswith('@NotBlank') for ann in annotations):
+        # 分析验证框架（str.startswith 接受前缀元组，一次调用完成多个前缀的比较）
+        if any(ann.startswith(_VALIDATION_ANNOTATION_PREFIXES) for ann in annotations):
             project_info["framework_info"]["validation"] = "javax.validation"
 
     def _infer_project_conventions(self, project_info):
         """根据学习结果推断项目规范"""
         # 分析命名规范
         for layer, patterns in project_info["layer_patterns"].items():
-            if patterns["naming"]:
-                # 分析后缀模式
-                suffixes = []
-                for name in patterns["naming"]:
-                    if layer == 'entity':
-                        if name.endswith('Entity'):
-                            suffixes.append('Entity')
-                        elif name.endswith('Model'):
-                            suffixes.append('Model')
-                        else:
-                            suffixes.append('')  # 无后缀
-                    elif layer == 'repository':
-                        if name.endswith('Repository'):
-                            suffixes.append('Repository')
-                        elif name.endswith('Dao'):
-                            suffixes.append('Dao')
-                        elif name.endswith('Mapper'):
-                            suffixes.append('Mapper')
-                    elif layer == 'service':
-                        if name.endswith('ServiceImpl'):
-                            suffixes.append('ServiceImpl')
-                        elif name.endswith('Service'):
-                            suffixes.append('Service')
-                    elif layer == 'controller':
-                        if name.endswith('Controller'):
-                            suffixes.append('Controller')
-                        elif name.endswith('Resource'):
-                            suffixes.append('Resource')
-
-                # 选择最常见的后缀
-                if suffixes:
-                    most_common_suffix = max(set(suffixes), key=suffixes.count)
-                    if layer == 'entity':
-                        project_info["project_conventions"]["entity_suffix"] = most_common_suffix
-                    elif layer == 'repository':
-                        project_info["project_conventions"]["repository_suffix"] = most_common_suffix
-                    elif layer == 'service':
-                        project_info["project_conventions"]["service_suffix"] = most_common_suffix
-                    elif layer == 'controller':
-                        project_info["project_conventions"]["controller_suffix"] = most_common_suffix
+            layer_suffixes = _SUFFIXES_BY_LAYER.get(layer)
+            if not layer_suffixes or not patterns["naming"]:
+                continue
+
+            # 分析后缀模式
+            suffixes = []
+            for name in patterns["naming"]:
+                for suffix in layer_suffixes:
+                    if name.endswith(suffix):
+                        suffixes.append(suffix)
+                        break
+
+            # 选择最常见的后缀（单次计数；数量相同时取最先出现的）
+            if suffixes:
+                most_common_suffix = Counter(suffixes).most_common(1)[0][0]
+                project_info["project_conventions"][f"{layer}_suffix"] = most_common_suffix
+
+    def _resolve_layer_settings(self, project_info):
+        """汇总每层最终采用的目录，保存文件时只需查表"""
+        # 使用项目中已有的目录结构（该层类文件最多的目录）
+        project_info["resolved_layer_dirs"] = {
+            layer: patterns["dirs"].most_common(1)[0][0]
+            for layer, patterns in project_info["layer_patterns"].items()
+            if patterns["dirs"]
+        }
 
     def _get_layer_directory(self, layer, project_info, package_name):
         """根据学习结果获取层的目录位置"""
-        import os
-        layer_patterns = project_info["layer_patterns"][layer]
-
-        if layer_patterns["dirs"]:
-            # 使用项目中已有的目录结构
-            most_common_dir = max(set(layer_patterns["dirs"]), key=layer_patterns["dirs"].count)
-            return most_common_dir
-        else:
-            # 使用默认目录结构
-            package_path = package_name.replace('.', os.sep)
-            return f"{package_path}/{layer}"
-
-    def _get_class_suffix(self, layer, project_info):
-        """根据学习结果获取类名后缀"""
-        conventions = project_info["project_conventions"]
-
-        suffix_map = {
-            'entity': conventions.get("entity_suffix", ""),
-            'repository': conventions.get("repository_suffix", "Repository"),
-            'service': conventions.get("service_suffix", "Service"),
-            'controller': conventions.get("controller_suffix", "Controller")
-        }
+        layer_dir = project_info["resolved_layer_dirs"].get(layer)
+        if layer_dir:
+            return layer_dir
 
-        return suffix_map.get(layer, "")
+        # 使用默认目录结构
+        package_path = package_name.replace('.', os.sep)
+        return f"{package_path}/{layer}"
 
     def _save_files_to_learned_structure(self, generated_files: Dict[str, Dict[str, str]],
                                        project_info: Dict[str, Any], package_name: str) -> list:
         """将生成的文件保存到学习到的项目结构中"""
-        import os
-        from pathlib import Path
-
         saved_files = []
-        src_main_java = project_info["src_main_java"]
+        pending_writes = []
+        src_main_java = Path(project_info["src_main_java"])
+        project_root = Path(project_info["project_root"])  # 循环外只构造一次
 
         # 确保源码目录存在
         src_main_java.mkdir(parents=True, exist_ok=True)
@@ -1015,48 +1192,51 @@ public class {entity_name}Response {{
             if layer == "dto/request" or layer == "dto/response":
                 # 处理 DTO 子目录
                 main_layer = "dto"
-                sub_layer = layer.split("/")[1]
+                sub_layer = layer.partition("/")[2]
                 layer_dir = self._get_layer_directory(main_layer, project_info, package_name)
-                layer_path = Path(src_main_java) / layer_dir / sub_layer
+                layer_path = src_main_java / layer_dir / sub_layer
             else:
                 layer_dir = self._get_layer_directory(layer, project_info, package_name)
-                layer_path = Path(src_main_java) / layer_dir
-
-            # 创建目录
-            layer_path.mkdir(parents=True, exist_ok=True)
+                layer_path = src_main_java / layer_dir
 
             for filename, content in files.items():
                 file_path = layer_path / filename
 
-                # 保存文件
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    f.write(content)
+                # 登记待写入的文件，循环结束后统一创建目录并并发写入
+                pending_writes.append((file_path, content))
 
                 # 记录保存的文件路径（相对于项目根目录）
                 try:
-                    relative_path = file_path.relative_to(Path(project_info["project_root"]))
+                    relative_path = file_path.relative_to(project_root)
                     saved_files.append(str(relative_path))
                 except ValueError:
                     # 如果无法计算相对路径，使用绝对路径
                     saved_files.append(str(file_path))
 
+        _write_source_files(pending_writes)
         return saved_files
 
 async def main():
     """主函数 - 标准输入输出模式"""
     server = 代码生成MCP服务器Server()
 
+    # 直接读写二进制缓冲区，省去文本层的逐行解码和编码
+    stdin = sys.stdin.buffer
+    stdout = sys.stdout.buffer
+
     while True:
         try:
-            line = sys.stdin.readline()
+            line = stdin.readline()
             if not line:
                 break
 
-            request = json.loads(line.strip())
-            response = await server.handle_request(request)
+            # 空行和明显不是 JSON 的行直接跳过，免去解析失败抛异常的开销
+            stripped = line.lstrip()
+            if not stripped or stripped[:1] not in b'{[':
+                continue
 
-            print(json.dumps(response))
-            sys.stdout.flush()
+            stdout.write(await server.handle_request_bytes(line) + b"\n")
+            stdout.flush()
 
         except json.JSONDecodeError:
             continue
@@ -1069,8 +1249,8 @@ async def main():
                     "message": str(e)
                 }
             }
-            print(json.dumps(error_response))
-            sys.stdout.flush()
+            stdout.write(json.dumps(error_response).encode('ascii') + b"\n")
+            stdout.flush()
 
 if __name__ == "__main__":
     asyncio.run(main())
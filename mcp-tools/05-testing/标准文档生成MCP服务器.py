@@ -6,8 +6,48 @@
 
 import asyncio
 import json
+import os
 import sys
-from typing import Any, Dict, List
+from string import Template
+from typing import Any, Dict
+
+# 工具结果编码器：默认不缩进，走 json 的 C 加速编码路径；
+# 设置环境变量 MCP_PRETTY 时按 2 空格缩进输出，便于调试时阅读
+_RESULT_ENCODER = json.JSONEncoder(indent=2 if os.environ.get("MCP_PRETTY") else None,
+                                   ensure_ascii=False)
+
+# API 文档骨架：内容固定，模块加载时构建一次
+_API_DOCUMENTATION = {
+    "title": "API 文档",
+    "version": "1.0.0",
+    "base_url": "http://localhost:8080/api",
+    "endpoints": [
+        {"path": "/users", "method": "GET", "description": "获取用户列表"},
+        {"path": "/users", "method": "POST", "description": "创建用户"},
+        {"path": "/users/{id}", "method": "GET", "description": "获取用户详情"}
+    ]
+}
+
+# README 模板：生成时只替换项目名称和描述
+_README_TEMPLATE = Template("""# ${project_name}
+
+## 项目描述
+${description}
+
+## 技术栈
+- Spring Boot
+- MySQL
+- Redis
+- Maven
+
+## 快速开始
+1. 克隆项目
+2. 配置数据库
+3. 运行项目
+
+## API 文档
+请查看 /docs 目录下的API文档
+""")
 
 class 文档生成Server:
     def __init__(self):
@@ -47,6 +87,21 @@ class 文档生成Server:
                         }
             }
 }
+        # 工具名 -> 处理方法，初始化时构建一次，调用时只需一次字典查找
+        self._handlers = {}
+        for name in self.tools:
+            handler = getattr(self, f"handle_{name}", None)
+            if handler is not None:
+                self._handlers[name] = handler
+        # tools/list 的响应内容只依赖工具定义，预先构建
+        self._tools_list = [
+            {
+                "name": name,
+                "description": tool_info["description"],
+                "inputSchema": tool_info["parameters"]
+            }
+            for name, tool_info in self.tools.items()
+        ]
     
     async def handle_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
         """处理 MCP 请求"""
@@ -70,18 +125,10 @@ class 文档生成Server:
                 }
             
             elif method == "tools/list":
-                tools_list = []
-                for name, tool_info in self.tools.items():
-                    tools_list.append({
-                        "name": name,
-                        "description": tool_info["description"],
-                        "inputSchema": tool_info["parameters"]
-                    })
-                
                 return {
                     "jsonrpc": "2.0",
                     "id": request_id,
-                    "result": {"tools": tools_list}
+                    "result": {"tools": self._tools_list}
                 }
             
             elif method == "tools/call":
@@ -89,8 +136,9 @@ class 文档生成Server:
                 arguments = params.get("arguments", {})
                 
                 # 调用对应的工具方法
-                if hasattr(self, f"handle_{tool_name}"):
-                    result = await getattr(self, f"handle_{tool_name}")(arguments)
+                handler = self._handlers.get(tool_name)
+                if handler is not None:
+                    result = await handler(arguments)
                 else:
                     result = await self.handle_default_tool(tool_name, arguments)
                 
@@ -100,7 +148,7 @@ class 文档生成Server:
                     "result": {
                         "content": [{
                             "type": "text",
-                            "text": json.dumps(result, indent=2, ensure_ascii=False)
+                            "text": _RESULT_ENCODER.encode(result)
                         }]
                     }
                 }
@@ -133,16 +181,9 @@ class 文档生成Server:
         """生成API文档"""
         project_path = arguments.get("project_path", ".")
         
-        api_doc = {
-            "title": "API 文档",
-            "version": "1.0.0",
-            "base_url": "http://localhost:8080/api",
-            "endpoints": [
-                {"path": "/users", "method": "GET", "description": "获取用户列表"},
-                {"path": "/users", "method": "POST", "description": "创建用户"},
-                {"path": "/users/{id}", "method": "GET", "description": "获取用户详情"}
-            ]
-        }
+        # 复制顶层字典和 endpoints 中的每一项再返回，调用方修改返回值不会影响共享的文档骨架
+        api_doc = dict(_API_DOCUMENTATION)
+        api_doc["endpoints"] = [dict(endpoint) for endpoint in _API_DOCUMENTATION["endpoints"]]
         
         return {
             "status": "success",
@@ -154,25 +195,7 @@ class 文档生成Server:
         project_name = arguments.get("project_name", "项目")
         description = arguments.get("description", "这是一个优秀的项目")
         
-        readme_content = f"""# {project_name}
-
-## 项目描述
-{description}
-
-## 技术栈
-- Spring Boot
-- MySQL
-- Redis
-- Maven
-
-## 快速开始
-1. 克隆项目
-2. 配置数据库
-3. 运行项目
-
-## API 文档
-请查看 /docs 目录下的API文档
-"""
+        readme_content = _README_TEMPLATE.substitute(project_name=project_name, description=description)
         
         return {
             "status": "success",
@@ -183,18 +206,26 @@ class 文档生成Server:
 async def main():
     """主函数 - 标准输入输出模式"""
     server = 文档生成Server()
+    stdin = sys.stdin.buffer
+    # 直接写二进制缓冲区：json.dumps 默认只输出 ASCII，可按 ASCII 快速编码，省去 print 和文本层编码
+    stdout = sys.stdout.buffer
     
     while True:
         try:
-            line = sys.stdin.readline()
+            line = stdin.readline()
             if not line:
                 break
             
-            request = json.loads(line.strip())
+            # 空行和明显不是 JSON 的行直接跳过，免去解析失败抛异常的开销
+            stripped = line.lstrip()
+            if not stripped or stripped[:1] not in b'{[':
+                continue
+            
+            request = json.loads(line)
             response = await server.handle_request(request)
             
-            print(json.dumps(response))
-            sys.stdout.flush()
+            stdout.write(json.dumps(response).encode('ascii') + b"\n")
+            stdout.flush()
             
         except json.JSONDecodeError:
             continue
@@ -207,8 +238,8 @@ async def main():
                     "message": str(e)
                 }
             }
-            print(json.dumps(error_response))
-            sys.stdout.flush()
+            stdout.write(json.dumps(error_response).encode('ascii') + b"\n")
+            stdout.flush()
 
 if __name__ == "__main__":
     asyncio.run(main())
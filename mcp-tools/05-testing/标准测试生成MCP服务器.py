@@ -6,8 +6,48 @@
 
 import asyncio
 import json
+import os
 import sys
-from typing import Any, Dict, List
+from functools import lru_cache
+from string import Template
+from typing import Any, Dict
+
+# 工具结果编码器：默认不缩进，走 json 的 C 加速编码路径；
+# 设置环境变量 MCP_PRETTY 时按 2 空格缩进输出，便于调试时阅读
+_RESULT_ENCODER = json.JSONEncoder(indent=2 if os.environ.get("MCP_PRETTY") else None,
+                                   ensure_ascii=False)
+
+# 单元测试模板：模块加载时构建一次，生成时只做变量替换
+_UNIT_TEST_TEMPLATE = Template("""package com.example.test;
+
+// import org.junit.jupiter.api.Test;
+// import org.junit.jupiter.api.BeforeEach;
+// import org.mockito.InjectMocks;
+// import org.mockito.Mock;
+// import org.mockito.MockitoAnnotations;
+// import static org.junit.jupiter.api.Assertions.*;
+
+public class ${class_name}Test {
+    
+    @InjectMocks
+    private ${class_name} ${class_var};
+    
+    @BeforeEach
+    void setUp() {
+        MockitoAnnotations.openMocks(this);
+    }
+    
+    @Test
+    void test${class_name}Creation() {
+        assertNotNull(${class_var});
+    }
+}""")
+
+
+@lru_cache(maxsize=256)
+def _render_unit_test(class_name: str) -> str:
+    """渲染单元测试类，同一类名重复请求时直接返回缓存结果"""
+    return _UNIT_TEST_TEMPLATE.substitute(class_name=class_name, class_var=class_name.lower())
 
 class 测试生成Server:
     def __init__(self):
@@ -47,6 +87,21 @@ class 测试生成Server:
                         }
             }
 }
+        # 工具名 -> 处理方法，初始化时构建一次，调用时只需一次字典查找
+        self._handlers = {}
+        for name in self.tools:
+            handler = getattr(self, f"handle_{name}", None)
+            if handler is not None:
+                self._handlers[name] = handler
+        # tools/list 的响应内容只依赖工具定义，预先构建
+        self._tools_list = [
+            {
+                "name": name,
+                "description": tool_info["description"],
+                "inputSchema": tool_info["parameters"]
+            }
+            for name, tool_info in self.tools.items()
+        ]
     
     async def handle_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
         """处理 MCP 请求"""
@@ -70,18 +125,10 @@ class 测试生成Server:
                 }
             
             elif method == "tools/list":
-                tools_list = []
-                for name, tool_info in self.tools.items():
-                    tools_list.append({
-                        "name": name,
-                        "description": tool_info["description"],
-                        "inputSchema": tool_info["parameters"]
-                    })
-                
                 return {
                     "jsonrpc": "2.0",
                     "id": request_id,
-                    "result": {"tools": tools_list}
+                    "result": {"tools": self._tools_list}
                 }
             
             elif method == "tools/call":
@@ -89,8 +136,9 @@ class 测试生成Server:
                 arguments = params.get("arguments", {})
                 
                 # 调用对应的工具方法
-                if hasattr(self, f"handle_{tool_name}"):
-                    result = await getattr(self, f"handle_{tool_name}")(arguments)
+                handler = self._handlers.get(tool_name)
+                if handler is not None:
+                    result = await handler(arguments)
                 else:
                     result = await self.handle_default_tool(tool_name, arguments)
                 
@@ -100,7 +148,7 @@ class 测试生成Server:
                     "result": {
                         "content": [{
                             "type": "text",
-                            "text": json.dumps(result, indent=2, ensure_ascii=False)
+                            "text": _RESULT_ENCODER.encode(result)
                         }]
                     }
                 }
@@ -134,30 +182,7 @@ class 测试生成Server:
         class_name = arguments.get("class_name", "")
         methods = arguments.get("methods", [])
         
-        test_code = f"""package com.example.test;
-
-// import org.junit.jupiter.api.Test;
-// import org.junit.jupiter.api.BeforeEach;
-// import org.mockito.InjectMocks;
-// import org.mockito.Mock;
-// import org.mockito.MockitoAnnotations;
-// import static org.junit.jupiter.api.Assertions.*;
-
-public class {class_name}Test {{
-    
-    @InjectMocks
-    private {class_name} {class_name.lower()};
-    
-    @BeforeEach
-    void setUp() {{
-        MockitoAnnotations.openMocks(this);
-    }}
-    
-    @Test
-    void test{class_name}Creation() {{
-        assertNotNull({class_name.lower()});
-    }}
-}}"""
+        test_code = _render_unit_test(class_name)
         
         return {
             "status": "success",
@@ -189,18 +214,26 @@ public class {class_name}Test {{
 async def main():
     """主函数 - 标准输入输出模式"""
     server = 测试生成Server()
+    stdin = sys.stdin.buffer
+    # 直接写二进制缓冲区：json.dumps 默认只输出 ASCII，可按 ASCII 快速编码，省去 print 和文本层编码
+    stdout = sys.stdout.buffer
     
     while True:
         try:
-            line = sys.stdin.readline()
+            line = stdin.readline()
             if not line:
                 break
             
-            request = json.loads(line.strip())
+            # 空行和明显不是 JSON 的行直接跳过，免去解析失败抛异常的开销
+            stripped = line.lstrip()
+            if not stripped or stripped[:1] not in b'{[':
+                continue
+            
+            request = json.loads(line)
             response = await server.handle_request(request)
             
-            print(json.dumps(response))
-            sys.stdout.flush()
+            stdout.write(json.dumps(response).encode('ascii') + b"\n")
+            stdout.flush()
             
         except json.JSONDecodeError:
             continue
@@ -213,8 +246,8 @@ async def main():
                     "message": str(e)
                 }
             }
-            print(json.dumps(error_response))
-            sys.stdout.flush()
+            stdout.write(json.dumps(error_response).encode('ascii') + b"\n")
+            stdout.flush()
 
 if __name__ == "__main__":
     asyncio.run(main())
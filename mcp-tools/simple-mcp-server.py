@@ -6,10 +6,23 @@
 
 import asyncio
 import json
-import sys
 import os
-from pathlib import Path
-from typing import Any, Dict, List
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Dict
+
+# 工具结果编码器：默认不缩进，走 json 的 C 加速编码路径；
+# 设置环境变量 MCP_PRETTY 时按 2 空格缩进输出，便于调试时阅读
+_RESULT_ENCODER = json.JSONEncoder(indent=2 if os.environ.get("MCP_PRETTY") else None,
+                                   ensure_ascii=False)
+
+# 输出合并写入：有其他请求仍在处理时，缓冲超过该字节数立即刷新，否则在短暂延迟后统一刷新
+_OUTPUT_FLUSH_BYTES = 64 * 1024
+_OUTPUT_FLUSH_DELAY = 0.005
+
+# 工具处理线程数：工具在线程池中执行，多个 tools/call 请求可以重叠处理
+_TOOL_WORKERS = 8
 
 class SimpleMCPServer:
     """简化版 MCP 服务器"""
@@ -47,6 +60,22 @@ class SimpleMCPServer:
                 }
             }
         }
+        # 工具名 -> 处理方法，初始化时构建一次，调用时只需一次字典查找
+        self._handlers = {}
+        for name in self.tools:
+            handler = getattr(self, f"handle_{name}", None)
+            if handler is not None:
+                self._handlers[name] = handler
+        # tools/list 的响应内容只依赖工具定义，预先构建
+        self._tools_list = [
+            {
+                "name": name,
+                "description": tool_info["description"],
+                "inputSchema": tool_info["parameters"]
+            }
+            for name, tool_info in self.tools.items()
+        ]
+        self._executor = ThreadPoolExecutor(max_workers=_TOOL_WORKERS)
 
     async def handle_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
         """处理 MCP 请求"""
@@ -70,29 +99,22 @@ class SimpleMCPServer:
                 }
 
             elif method == "tools/list":
-                tools_list = []
-                for name, tool_info in self.tools.items():
-                    tools_list.append({
-                        "name": name,
-                        "description": tool_info["description"],
-                        "inputSchema": tool_info["parameters"]
-                    })
-
                 return {
                     "jsonrpc": "2.0",
                     "id": request_id,
-                    "result": {"tools": tools_list}
+                    "result": {"tools": self._tools_list}
                 }
 
             elif method == "tools/call":
                 tool_name = params.get("name")
                 arguments = params.get("arguments", {})
 
-                # 调用对应的工具方法
-                if hasattr(self, f"handle_{tool_name}"):
-                    result = await getattr(self, f"handle_{tool_name}")(arguments)
-                else:
-                    result = await self.handle_default_tool(tool_name, arguments)
+                # 调用对应的工具方法，放到线程池执行，避免阻塞事件循环
+                handler = self._handlers.get(tool_name)
+                if handler is None:
+                    handler = partial(self.handle_default_tool, tool_name)
+                loop = asyncio.get_running_loop()
+                result = await loop.run_in_executor(self._executor, handler, arguments)
 
                 return {
                     "jsonrpc": "2.0",
@@ -100,7 +122,7 @@ class SimpleMCPServer:
                     "result": {
                         "content": [{
                             "type": "text",
-                            "text": json.dumps(result, indent=2, ensure_ascii=False)
+                            "text": _RESULT_ENCODER.encode(result)
                         }]
                     }
                 }
@@ -118,7 +140,7 @@ class SimpleMCPServer:
                 }
             }
 
-    async def handle_default_tool(self, tool_name: str, arguments: Dict[str, Any]):
+    def handle_default_tool(self, tool_name: str, arguments: Dict[str, Any]):
         """默认工具处理器"""
         return {
             "status": "success",
@@ -128,7 +150,7 @@ class SimpleMCPServer:
             "result": "功能正常运行"
         }
 
-    async def handle_analyze_requirements(self, arguments: Dict[str, Any]):
+    def handle_analyze_requirements(self, arguments: Dict[str, Any]):
         """分析需求"""
         requirements_text = arguments.get("requirements_text", "")
 
@@ -146,7 +168,7 @@ class SimpleMCPServer:
             }
         }
 
-    async def handle_generate_code(self, arguments: Dict[str, Any]):
+    def handle_generate_code(self, arguments: Dict[str, Any]):
         """生成代码"""
         entity_name = arguments.get("entity_name", "")
         fields = arguments.get("fields", [])
@@ -165,32 +187,80 @@ class SimpleMCPServer:
 async def main():
     """主函数 - 标准输入输出模式"""
     server = SimpleMCPServer()
+    loop = asyncio.get_running_loop()
+    stdin = sys.stdin.buffer
+    # 直接写二进制缓冲区：json.dumps 默认只输出 ASCII，可按 ASCII 快速编码，省去 print 和文本层编码
+    stdout = sys.stdout.buffer
+    # 突发请求时把多条响应合并为一次写入和刷新，减少系统调用；每条响应仍以换行分隔
+    out_buf = bytearray()
+    flush_handle = None
+    # 正在处理的请求任务：每个请求作为独立任务处理，读取下一行时不必等待上一个请求完成；
+    # 响应按完成顺序写出，客户端通过 id 对应请求
+    pending = set()
+
+    def flush_output():
+        nonlocal flush_handle
+        if flush_handle is not None:
+            flush_handle.cancel()
+            flush_handle = None
+        if out_buf:
+            stdout.write(out_buf)
+            stdout.flush()
+            del out_buf[:]
+
+    def queue_output(message: Dict[str, Any]):
+        nonlocal flush_handle
+        out_buf.extend(json.dumps(message).encode('ascii'))
+        out_buf.extend(b"\n")
+        # 没有其他请求在处理时（pending 中只剩当前任务）立即写出，单次请求不增加延迟
+        if len(pending) <= 1 or len(out_buf) >= _OUTPUT_FLUSH_BYTES:
+            flush_output()
+        elif flush_handle is None:
+            flush_handle = loop.call_later(_OUTPUT_FLUSH_DELAY, flush_output)
+
+    def queue_error(e: Exception):
+        queue_output({
+            "jsonrpc": "2.0",
+            "id": None,
+            "error": {
+                "code": -32000,
+                "message": str(e)
+            }
+        })
+
+    async def process_line(line: bytes):
+        try:
+            request = json.loads(line)
+            response = await server.handle_request(request)
+            queue_output(response)
+        except json.JSONDecodeError:
+            return
+        except Exception as e:
+            queue_error(e)
 
     while True:
         try:
-            line = sys.stdin.readline()
+            # 在线程池中阻塞读取一行原始字节，读取期间不占用事件循环
+            line = await loop.run_in_executor(None, stdin.readline)
             if not line:
                 break
 
-            request = json.loads(line.strip())
-            response = await server.handle_request(request)
+            # 空行和明显不是 JSON 的行直接跳过，免去解析失败抛异常的开销
+            stripped = line.lstrip()
+            if not stripped or stripped[:1] not in b'{[':
+                continue
 
-            print(json.dumps(response))
-            sys.stdout.flush()
+            task = loop.create_task(process_line(line))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
 
-        except json.JSONDecodeError:
-            continue
         except Exception as e:
-            error_response = {
-                "jsonrpc": "2.0",
-                "id": None,
-                "error": {
-                    "code": -32000,
-                    "message": str(e)
-                }
-            }
-            print(json.dumps(error_response))
-            sys.stdout.flush()
+            queue_error(e)
+
+    # 输入结束时等待未完成的请求，再写出剩余的响应
+    if pending:
+        await asyncio.gather(*pending)
+    flush_output()
 
 if __name__ == "__main__":
     asyncio.run(main())